@@ -72,6 +72,11 @@ def list_(json_):
 @click.argument("decoder", required=True)
 @click.argument("input", nargs=-1, type=click.Path())
 @click.option("-j", "--json", "json_", is_flag=True, help="Display as JSON output.")
+@click.option(
+    "--compact",
+    is_flag=True,
+    help="Display JSON output without indentation. Implies --json. (Significantly faster for large results.)",
+)
 # TODO: We can't allow user to change decoder output directory until a bit more refactoring is done.
 # @click.option('-o', '--output-dir', type=click.Path(exists=True, file_okay=False),
 #               help='Output directory.')
@@ -104,7 +109,7 @@ def list_(json_):
     help="Identifies if input file is 64 bit or 32 bit, which is used to determine whether to run ida64 or ida. "
          "If not provided, bitness is automatically determined by examining the input file."
 )
-def parse(decoder, input, json_, output_files, cleanup, tempdir, enable_ida_log, timeout, is_64bit):
+def parse(decoder, input, json_, compact, output_files, cleanup, tempdir, enable_ida_log, timeout, is_64bit):
     """
     Parses given input with given parser.
 
@@ -117,7 +122,11 @@ def parse(decoder, input, json_, output_files, cleanup, tempdir, enable_ida_log,
         kordesii parse foo ./malware.bin                         - Run foo decoder on ./malware.bin
         kordesii parse foo ./repo/*                              - Run foo decoder on files found in repo directory.
         kordesii parse --json foo ./malware.bin                  - Run foo decoder and display results as json.
+        kordesii parse --compact foo ./malware.bin               - Run foo decoder and display results as compact json.
     """
+    # Compact output only applies to JSON.
+    json_ = json_ or compact
+
     # Python won't process wildcards when used through Windows command prompt.
     if any("*" in path for path in input):
         new_input = []
@@ -160,7 +169,11 @@ def parse(decoder, input, json_, output_files, cleanup, tempdir, enable_ida_log,
                 reporter.print_report()
 
         if json_:
-            print(json.dumps(results, indent=4))
+            # json only uses its C accelerated encoder when not indenting.
+            if compact:
+                print(json.dumps(results, separators=(",", ":")))
+            else:
+                print(json.dumps(results, indent=4))
 
     except Exception as e:
         error_message = "Error running DC3-Kordesii: {}".format(e)
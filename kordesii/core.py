@@ -322,22 +322,25 @@ def run_ida(
         with io.open(log_file_path, "r", encoding="utf-8", errors="replace") as f:
             reporter.ida_log = f.read()
 
-            # Also throw logs to debug.
-            f.seek(0)
-            for line in f.readlines():
-                ida_logger.debug(line.rstrip("\r\n"))
+        # Also throw logs to debug.
+        # (Skipped entirely when debug is disabled since the log can be quite large.)
+        if ida_logger.isEnabledFor(logging.DEBUG):
+            for line in reporter.ida_log.splitlines():
+                ida_logger.debug(line)
 
     # Ingest any strings output by the script
     if os.path.isfile(strings_file_path):
-        with open(strings_file_path, "r") as f:
-            # NOTE: We can't sort and dedup because other parsers may depend on their order.
-            strings = [entry.rstrip("\r\n") for entry in f.readlines()]
-            # print("strings: " + repr(strings))
-        for string in strings:
-            try:
-                reporter.add_string(string.encode("latin1").decode("unicode-escape"))
-            except Exception as e:
-                logger.error("Bad string {!r}: {}".format(string, e))
+        # NOTE: We can't sort and dedup because other parsers may depend on their order.
+        strings = []
+        with open(strings_file_path, "rb") as f:
+            for entry in f:
+                entry = entry.rstrip(b"\r\n")
+                try:
+                    strings.append(entry.decode("unicode-escape"))
+                except Exception as e:
+                    logger.error("Bad string {!r}: {}".format(entry.decode("latin1"), e))
+        # Add all strings at once instead of one at a time.
+        reporter.add_strings(strings)
 
     # Ingest any files output by the script
     if os.path.exists(output_dir_path):
@@ -345,8 +348,7 @@ def run_ida(
             for file in files:
                 file_path = os.path.join(root, file)
                 with open(file_path, "rb") as fo:
-                    file_data = fo.read()
-                reporter.add_output_file(file, file_data)
+                    reporter.add_output_file(file, fo)
 
     # Perform cleanup as specified in the parameters
     if cleanup_txt_files:
@@ -101,6 +101,26 @@ def register_decoder_package(package, source_name=None):
     register_decoder_directory(os.path.dirname(package.__file__), source_name=source_name)
 
 
+def _find_script_path(source_path, name):
+    """
+    Finds the script path for the given decoder name within a source directory.
+
+    :param str source_path: Path to the source directory.
+    :param str name: Name of the decoder. ("." notation indicates subpackages)
+
+    :returns: Path to the decoder script or None if not found.
+    """
+    # Pull script using a "." notation to indicate subpackages.
+    script_path = os.path.join(source_path, *name.split(".")) + ".py"
+    if os.path.exists(script_path):
+        return script_path
+    # Also try with legacy postfix if it doesn't exists.
+    script_path = script_path[:-3] + "_StringDecode.py"
+    if os.path.exists(script_path):
+        return script_path
+    return None
+
+
 def iter_decoders(name=None, source=None):
     """
     Iterates paths to all registered decoders.
@@ -135,24 +155,23 @@ def iter_decoders(name=None, source=None):
     for source_name, source in sources:
         # Get script path for decoder.
         if name:
-            # Pull script using a "." notation to indicate subpackages.
-            script_path = os.path.join(source.path, *name.split(".")) + ".py"
-            # Also try with legacy postfix if it doesn't exists.
-            if not os.path.exists(script_path):
-                script_path = script_path[:-3] + "_StringDecode.py"
-            if os.path.exists(script_path):
+            script_path = _find_script_path(source.path, name)
+            if script_path:
                 yield Decoder(script_path, name=name, source=source)
             else:
                 logger.debug("Unable to find {}:{} decoder.".format(source_name, name))
         else:
             # Extract all decoders within the directory
             for root, directories, filenames in os.walk(source.path):
+                # Bytecode caches won't contain any decoders.
+                directories[:] = [directory for directory in directories if directory != "__pycache__"]
+                # Compute the "." notation prefix once per directory instead of for every file.
+                rel_root = os.path.relpath(root, source.path)
+                prefix = "" if rel_root == os.curdir else rel_root.replace(os.path.sep, ".") + "."
                 for filename in sorted(filenames, key=lambda f: f.lower()):  # Case-insensitive sorting.
                     if filename.endswith(".py") and not filename.startswith("_"):
                         script_path = os.path.join(root, filename)
-                        rel_path, _ = os.path.splitext(os.path.relpath(script_path, source.path))
-                        _name = rel_path.replace(os.path.sep, ".")
-                        yield Decoder(script_path, name=_name, source=source)
+                        yield Decoder(script_path, name=prefix + filename[:-3], source=source)
 
 
 def get_decoder_descriptions(name=None, source=None):
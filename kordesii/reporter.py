@@ -2,9 +2,13 @@
 DC3-Kordesii framework primary object used for execution of decoders and collection of metadata.
 """
 
-import base64
+import atexit
+import binascii
 import codecs
+import collections
 import contextlib
+import copy
+import functools
 import hashlib
 import io
 import os
@@ -12,7 +16,7 @@ import logging
 import shutil
 import sys
 import tempfile
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
 import kordesii
 from kordesii import decoders, logutil
@@ -26,6 +30,54 @@ FIELD_DEBUG = "debug"
 FIELD_STRINGS = "strings"
 FIELD_FILES = "files"
 
+# RAM backed filesystem available on most Linux systems.
+TMPFS_DIR = "/dev/shm"
+
+# Number of bytes processed at a time when hashing/encoding output file data.
+# (Must be a multiple of 3 so the base64 encoded chunks can be concatenated without padding.)
+_CHUNK_SIZE = 57 * 1024
+
+
+def _iter_chunks(data, chunk_size=_CHUNK_SIZE):
+    """
+    Iterates the given data in chunks.
+
+    :param data: bytes-like (e.g. bytes, mmap) or binary file-like object
+    :param chunk_size: Size of each chunk.
+    :yields: Chunks of data (without copying if data is bytes-like).
+    """
+    # NOTE: Bytes-like objects are checked first since some (ie. mmap) also have a read() function.
+    try:
+        view = memoryview(data)
+    except TypeError:
+        yield from iter(functools.partial(data.read, chunk_size), b"")
+    else:
+        for offset in range(0, len(view), chunk_size):
+            yield view[offset:offset + chunk_size]
+
+
+# Emptied managed temp directories available for reuse, keyed by parent directory.
+_tempdir_pool = collections.defaultdict(collections.deque)
+
+
+@atexit.register
+def _purge_tempdir_pool():
+    """Deletes any pooled managed temp directories on exit."""
+    for pool in _tempdir_pool.values():
+        while pool:
+            shutil.rmtree(pool.pop(), ignore_errors=True)
+
+
+def _empty_directory(directory):
+    """Deletes the contents of the given directory, leaving the directory itself."""
+    # Close the directory handle even on failure, so the caller can still fall back to removing it.
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+            else:
+                os.remove(entry.path)
+
 
 class ReporterLogHandler(logging.Handler):
     """Custom logging handler used to keep backwards compatible with legacy logging mechanism."""
@@ -41,9 +93,7 @@ class ReporterLogHandler(logging.Handler):
         # Even though reporter uses the name "debug".. This really is an INFO level debug message.
         # (Adding true DEBUG level messages would spam our console.)
         elif logging.INFO <= record.levelno <= logging.WARNING:
-            if "debug" not in self._reporter.metadata:
-                self._reporter.metadata["debug"] = []
-            self._reporter.metadata["debug"].append(message)
+            self._reporter.metadata.setdefault(FIELD_DEBUG, []).append(message)
 
 
 class Reporter(object):
@@ -59,6 +109,15 @@ class Reporter(object):
     Parameters:
     :param tempdir: sets attribute
     :param disabletempcleanup: disable cleanup (deletion) of temp files
+    :param cache_results: cache results of decoder runs by decoder name and input file contents,
+        so running the same decoder on the same sample again returns the previous results without running IDA.
+        (Cache is shared among Reporter instances and invalidated if the decoder script is modified.)
+    :param pool_tempdirs: reuse managed temp directories across decoder runs instead of creating and deleting
+        one for every run. Directories are emptied after each run and deleted on exit.
+        (Useful when processing large numbers of samples.)
+    :param use_tmpfs: create temporary files in a RAM backed filesystem (/dev/shm) if tempdir is not provided
+        and one is available. This avoids disk I/O for the sample and IDB files, but should not be used
+        for samples that may not fit in memory.
 
     Attributes:
     :var tempdir: directory where temporary files should be created. Files created in this directory should
@@ -71,12 +130,29 @@ class Reporter(object):
     :var strings: list of strings decoded by decoders.
     """
 
-    def __init__(self, tempdir=None, disabletempcleanup=False, base64outputfiles=False):
+    # Results of previous decoder runs shared across instances when cache_results is enabled.
+    # Maps cache key -> (metadata, errors, ida_log, file_index) in least recently used order.
+    _result_cache = collections.OrderedDict()
+    RESULT_CACHE_SIZE = 128
+
+    def __init__(
+        self,
+        tempdir=None,
+        disabletempcleanup=False,
+        base64outputfiles=False,
+        use_tmpfs=False,
+        cache_results=False,
+        pool_tempdirs=False,
+    ):
+        if not tempdir and use_tmpfs and os.path.isdir(TMPFS_DIR) and os.access(TMPFS_DIR, os.W_OK):
+            tempdir = TMPFS_DIR
         self.tempdir = tempdir or tempfile.gettempdir()
         self.metadata = {}
         self.errors = []
         # TODO: Remove disassembler specific details from reporter.
         self.ida_log = ""
+        # Maps output file names to their index within the files metadata.
+        self._file_index = {}
 
         self._log_handler = None
         self._temp_file_name = ""
@@ -84,6 +160,8 @@ class Reporter(object):
 
         self._disable_temp_cleanup = disabletempcleanup
         self._base64_output_files = base64outputfiles
+        self._cache_results = cache_results
+        self._pool_tempdirs = pool_tempdirs
 
         self._other_data = None
         self._deserialized_data = {}
@@ -110,7 +188,13 @@ class Reporter(object):
         _deserialized_data = self._deserialized_data
         if name in _deserialized_data:
             return _deserialized_data[name]
-        yml_data = self.get_file_contents("{}.yml".format(name))
+        # The raw contents of other_data.yml are already kept in the metadata (decoded as latin1),
+        # so avoid base64 decoding the file contents.
+        yml_data = self.metadata.get("other_data") if name == "other_data" else None
+        if yml_data is not None:
+            yml_data = yml_data.encode("latin1")
+        else:
+            yml_data = self.get_file_contents("{}.yml".format(name))
         data = deserialize(yml_data)
         _deserialized_data[name] = data
         return data
@@ -122,7 +206,14 @@ class Reporter(object):
         """
 
         if not self._managed_tempdir:
-            self._managed_tempdir = tempfile.mkdtemp(dir=self.tempdir, prefix="kordesii-managed_tempdir-")
+            if self._pool_tempdirs:
+                # Pop without checking first, since other reporters may be pulling from the same pool.
+                try:
+                    self._managed_tempdir = _tempdir_pool[self.tempdir].pop()
+                except IndexError:
+                    pass
+            if not self._managed_tempdir:
+                self._managed_tempdir = tempfile.mkdtemp(dir=self.tempdir, prefix="kordesii-managed_tempdir-")
 
             if self._disable_temp_cleanup:
                 logger.debug("Using managed temp dir: %s" % self._managed_tempdir)
@@ -133,13 +224,18 @@ class Reporter(object):
         """
         Record a decoded string
         """
-        fieldu = self.convert_to_unicode(FIELD_STRINGS)
-        stringu = self.convert_to_unicode(string)
-
-        if fieldu not in self.metadata:
-            self.metadata[fieldu] = []
+        if type(string) is not str:
+            string = self.convert_to_unicode(string)
+        self.metadata.setdefault(FIELD_STRINGS, []).append(string)
 
-        self.metadata[fieldu].append(stringu)
+    def add_strings(self, strings: Iterable[str]):
+        """
+        Record multiple decoded strings at once.
+        """
+        strings = [string if type(string) is str else self.convert_to_unicode(string) for string in strings]
+        # Avoid creating an empty strings entry, which would affect reported results.
+        if strings:
+            self.metadata.setdefault(FIELD_STRINGS, []).extend(strings)
 
     def get_strings(self) -> List[str]:
         """
@@ -153,19 +249,35 @@ class Reporter(object):
     def add_output_file(self, filename, data, description=""):
         """
         Add file and its data to metadata.
+
+        :param filename: Name of the file.
+        :param data: Contents of the file as bytes or a binary file-like object.
+            File-like objects are streamed so the full contents don't need to be held in memory.
+        :param description: Optional description of the file.
         """
-        fieldu = self.convert_to_unicode(FIELD_FILES)
         filenameu = self.convert_to_unicode(filename)
         descriptionu = self.convert_to_unicode(description)
-        md5 = hashlib.md5(data).hexdigest()
 
-        if fieldu not in self.metadata:
-            self.metadata[fieldu] = []
-
-        if self._base64_output_files:
-            self.metadata[fieldu].append([filenameu, descriptionu, md5, base64.b64encode(data).decode("latin1")])
+        # The contents of other_data.yml are kept, so there is nothing gained by streaming it.
+        if filenameu == u"other_data.yml" and hasattr(data, "read"):
+            data = data.read()
+
+        # Hash and encode in a single pass over the data.
+        md5 = hashlib.md5()
+        encoded = [] if self._base64_output_files else None
+        for chunk in _iter_chunks(data):
+            md5.update(chunk)
+            if encoded is not None:
+                encoded.append(binascii.b2a_base64(chunk, newline=False).decode("latin1"))
+        md5 = md5.hexdigest()
+
+        files = self.metadata.setdefault(FIELD_FILES, [])
+        # Only index the first occurrence of a file name to match previous lookup behavior.
+        self._file_index.setdefault(filenameu, len(files))
+        if encoded is not None:
+            files.append([filenameu, descriptionu, md5, "".join(encoded)])
         else:
-            self.metadata[fieldu].append([filenameu, descriptionu, md5])
+            files.append([filenameu, descriptionu, md5])
 
         if filenameu == u"other_data.yml":
             self.metadata["other_data"] = data.decode("latin1")
@@ -175,10 +287,13 @@ class Reporter(object):
         If the file name exists and has its contents are stored in the reporter, then take
         the base64 encoded contents, base64 decode it, and return it.
         """
-        if FIELD_FILES in self.metadata:
-            for entry in self.metadata[FIELD_FILES]:
-                if entry[0] == filename and len(entry) == 4:
-                    return base64.b64decode(entry[3])
+        index = self._file_index.get(filename)
+        if index is None:
+            return None
+
+        entry = self.metadata[FIELD_FILES][index]
+        if len(entry) == 4:
+            return binascii.a2b_base64(entry[3])
 
         return None
 
@@ -189,6 +304,7 @@ class Reporter(object):
         :param name: name of decoder module to run
         :param filename: file to parse
         :param data: use data as file instead of loading data from filename
+            (may be any bytes-like object, such as an mmap, which is written out in chunks)
         :param run_config: Extra configuration arguments to pass to kordesii.run_ida()
         """
         self.__reset()
@@ -196,13 +312,35 @@ class Reporter(object):
         if not (filename or data):
             raise ValueError("filename or data must be provided.")
 
+        cache_key = None
+        input_md5 = None
+        if self._cache_results:
+            input_md5 = self.__get_input_md5(filename, data)
+            cache_key = self.__get_cache_key(name, input_md5, run_config)
+            if cache_key in self._result_cache:
+                logger.debug("Using cached results for {} decoder.".format(name))
+                self._result_cache.move_to_end(cache_key)
+                self.metadata, self.errors, self.ida_log, self._file_index = copy.deepcopy(
+                    self._result_cache[cache_key]
+                )
+                self.__cleanup()
+                return
+
         if filename:
             input_file = filename
         else:
             # we were passed data buffer. Lazy initialize a temp file for this
-            input_file = os.path.join(self.managed_tempdir(), hashlib.md5(data).hexdigest())
-            with open(input_file, "wb") as file_object:
-                file_object.write(data)
+            # NOTE: Unless already computed for the cache key, the md5 is computed while writing
+            #   so the data is only traversed once.
+            tempdir = self.managed_tempdir()
+            digest = None if input_md5 else hashlib.md5()
+            with tempfile.NamedTemporaryFile(dir=tempdir, delete=False) as file_object:
+                for chunk in _iter_chunks(data):
+                    if digest:
+                        digest.update(chunk)
+                    file_object.write(chunk)
+            input_file = os.path.join(tempdir, input_md5 or digest.hexdigest())
+            os.replace(file_object.name, input_file)
 
         try:
             with self.__redirect_stdout():
@@ -221,6 +359,45 @@ class Reporter(object):
         finally:
             self.__cleanup()
 
+        # Don't cache failed runs since errors may be intermittent. (e.g. timeouts)
+        if cache_key and not self.errors:
+            self._result_cache[cache_key] = copy.deepcopy(
+                (self.metadata, self.errors, self.ida_log, self._file_index)
+            )
+            while len(self._result_cache) > self.RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+
+    @staticmethod
+    def __get_input_md5(filename, data):
+        """
+        Computes the md5 hex digest of the input file or data.
+        """
+        digest = hashlib.md5()
+        if filename:
+            with open(filename, "rb") as fo:
+                for chunk in _iter_chunks(fo):
+                    digest.update(chunk)
+        else:
+            for chunk in _iter_chunks(data):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def __get_cache_key(self, name, input_md5, run_config):
+        """
+        Generates key used to cache the results of a decoder run.
+        """
+        # Include modification times of decoder scripts so results are invalidated if a decoder changes.
+        script_times = tuple(
+            (decoder.script_path, os.path.getmtime(decoder.script_path)) for decoder in kordesii.iter_decoders(name)
+        )
+        return (
+            name,
+            input_md5,
+            script_times,
+            repr(sorted(run_config.items())),
+            self._base64_output_files,
+        )
+
     def convert_to_unicode(self, input_string):
         if isinstance(input_string, str):
             return input_string
@@ -243,37 +420,30 @@ class Reporter(object):
         Get data in human readable report format.
         """
 
-        output = u""
-
-        output += u"----Decoded Strings----\n\n"
+        parts = [u"----Decoded Strings----\n\n"]
 
         if FIELD_STRINGS not in self.metadata:
-            output += u"No decoded strings found\n"
+            parts.append(u"No decoded strings found\n")
         else:
-            for item in self.metadata[FIELD_STRINGS]:
-                output += u"{}\n".format(item.encode("unicode-escape").decode())
+            parts.extend(u"%s\n" % item.encode("unicode-escape").decode() for item in self.metadata[FIELD_STRINGS])
 
         if FIELD_FILES in self.metadata:
-            output += u"\n----Files----\n\n"
-            for item in self.metadata[FIELD_FILES]:
-                filename = item[0]
-                output += u"{}\n".format(filename)
+            parts.append(u"\n----Files----\n\n")
+            parts.extend(u"%s\n" % item[0] for item in self.metadata[FIELD_FILES])
 
         if FIELD_DEBUG in self.metadata:
-            output += u"\n----Debug----\n\n"
-            for item in self.metadata[FIELD_DEBUG]:
-                output += u"{}\n".format(item)
+            parts.append(u"\n----Debug----\n\n")
+            parts.extend(u"%s\n" % item for item in self.metadata[FIELD_DEBUG])
 
         if self.ida_log:
-            output += u"\n----IDA Log----\n\n"
-            output += u"{}\n".format(self.ida_log)
+            parts.append(u"\n----IDA Log----\n\n")
+            parts.append(u"%s\n" % self.ida_log)
 
         if self.errors:
-            output += u"\n----Errors----\n\n"
-            for item in self.errors:
-                output += u"{}\n".format(item)
+            parts.append(u"\n----Errors----\n\n")
+            parts.extend(u"%s\n" % item for item in self.errors)
 
-        return output
+        return u"".join(parts)
 
     @contextlib.contextmanager
     def __redirect_stdout(self):
@@ -284,9 +454,11 @@ class Reporter(object):
         try:
             yield
         finally:
-            for line in debug_stdout.getvalue().splitlines():
-                logger.debug(line)
             sys.stdout = orig_stdout
+            # Check the log level once up front instead of on each line.
+            if logger.isEnabledFor(logging.DEBUG):
+                for line in debug_stdout.getvalue().splitlines():
+                    logger.debug(line)
 
     def __reset(self):
         """
@@ -300,6 +472,7 @@ class Reporter(object):
         self.metadata = {}
         self.errors = []
         self.ida_log = ""
+        self._file_index = {}
 
         # To keep backwards compatibility, setup log handler to add errors and debug messages to reporter.
         # TODO: Remove this when the Reporter object should no longer be responsible for logging.
@@ -314,6 +487,10 @@ class Reporter(object):
         """
         Cleanup things
         """
+        # Nothing to do if already cleaned up. (e.g. __del__ after run_decoder())
+        if not (self._log_handler or self._temp_file_name or self._managed_tempdir):
+            return
+
         # Remove log handler.
         if self._log_handler:
             logging.root.removeHandler(self._log_handler)
@@ -326,17 +503,27 @@ class Reporter(object):
                     os.remove(self._temp_file_name)
                 except Exception as e:
                     logger.warning("Failed to purge temp file: %s, %s" % (self._temp_file_name, str(e)))
-                self._temp_file_name = ""
 
             if self._managed_tempdir:
-                try:
-                    shutil.rmtree(self._managed_tempdir, ignore_errors=True)
-                except Exception as e:
-                    logger.warning("Failed to purge temp dir: %s, %s" % (self._managed_tempdir, str(e)))
-                self._managed_tempdir = ""
+                if self._pool_tempdirs:
+                    try:
+                        _empty_directory(self._managed_tempdir)
+                        _tempdir_pool[self.tempdir].append(self._managed_tempdir)
+                    except Exception as e:
+                        logger.debug("Failed to empty temp dir for reuse: %s, %s" % (self._managed_tempdir, str(e)))
+                        shutil.rmtree(self._managed_tempdir, ignore_errors=True)
+                else:
+                    try:
+                        shutil.rmtree(self._managed_tempdir, ignore_errors=True)
+                    except Exception as e:
+                        logger.warning("Failed to purge temp dir: %s, %s" % (self._managed_tempdir, str(e)))
 
         self._temp_file_name = ""
         self._managed_tempdir = ""
 
     def __del__(self):
-        self.__cleanup()
+        # Modules may already be torn down if we are being collected during interpreter shutdown.
+        try:
+            self.__cleanup()
+        except Exception:
+            pass
@@ -8,6 +8,7 @@ from timeit import default_timer
 import difflib
 import json
 import logging
+import mmap
 import multiprocessing as mp
 import os
 import pathlib
@@ -173,10 +174,10 @@ class Tester(object):
         """
         Generate JSON results for the given file using the given decoder name.
         """
-        # Read in data so we avoid placing idb files in the malware repo.
-        with open(input_file_path, "rb") as f:
-            data = f.read()
-        self.reporter.run_decoder(decoder_name, data=data, log=True)
+        # Pass in data so we avoid placing idb files in the malware repo.
+        # (Memory mapped so we don't need to hold the whole sample in memory.)
+        with open(input_file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            self.reporter.run_decoder(decoder_name, data=data, log=True)
         self.reporter.metadata[INPUT_FILE_PATH] = os.path.abspath(input_file_path)
         return self.reporter.metadata
 
@@ -359,10 +360,10 @@ class TestCase(object):
         """Run test case."""
         start_time = default_timer()
 
-        # Read in data so we avoid placing idb files in the malware repo.
-        with open(self.input_file_path, "rb") as f:
-            data = f.read()
-        self._reporter.run_decoder(self.decoder_name, data=data, log=True)
+        # Pass in data so we avoid placing idb files in the malware repo.
+        # (Memory mapped so we don't need to hold the whole sample in memory.)
+        with open(self.input_file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            self._reporter.run_decoder(self.decoder_name, data=data, log=True)
         self._reporter.metadata[INPUT_FILE_PATH] = self.input_file_path
         results = self._reporter.metadata
 
@@ -0,0 +1,57 @@
+"""
+Common decryption routines used by decoders.
+
+These avoid walking the data byte by byte in Python, which can be slow on large buffers.
+"""
+
+from typing import Union
+
+import numpy
+from Crypto.Cipher import ARC4
+
+
+__all__ = [
+    "xor_decrypt",
+    "rc4_decrypt",
+]
+
+
+def xor_decrypt(data: bytes, key: Union[int, bytes]) -> bytes:
+    """
+    XOR decrypts data with a single byte or repeating multi-byte key.
+
+    .. code_block:: python
+
+        decrypted = crypto.xor_decrypt(encrypted, 0x42)
+        decrypted = crypto.xor_decrypt(encrypted, b"secret")
+
+    :param data: Data to decrypt.
+    :param key: Single byte integer or bytes to use as a repeating key.
+
+    :returns: Decrypted data.
+
+    :raises ValueError: If key is empty or an integer outside of the byte range.
+    """
+    if isinstance(key, int):
+        key = bytes([key])
+    if not key:
+        raise ValueError("XOR key cannot be empty.")
+    if not data:
+        return b""
+
+    data = numpy.frombuffer(data, dtype=numpy.uint8)
+    key = numpy.frombuffer(key, dtype=numpy.uint8)
+    # numpy.resize() repeats the key to fill the length of the data.
+    return numpy.bitwise_xor(data, numpy.resize(key, data.size)).tobytes()
+
+
+def rc4_decrypt(data: bytes, key: bytes) -> bytes:
+    """
+    RC4 decrypts data with the given key.
+
+    :param data: Data to decrypt.
+    :param key: RC4 key.
+
+    :returns: Decrypted data.
+    """
+    return ARC4.new(key).decrypt(data)
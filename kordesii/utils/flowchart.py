@@ -4,15 +4,17 @@ functionality including Breadth-First and Depth-First chart traversal, locating
 chart based on an EA, generating a list of all possible paths to a specified EA, etc.
 """
 
+import bisect
+import collections
 import functools
 import logging
 from operator import attrgetter
-from typing import Optional, Set, Iterator
+from typing import Optional, Set, Iterator, Tuple
 
+import ida_bytes
 import ida_idaapi
 import ida_gdl
 import ida_funcs
-import idautils
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +25,13 @@ class PathNode(object):
     This object can also track cpu context up to a certain EA.
     """
 
-    _cache = {}
+    # Large numbers of path nodes can get created, so avoid the overhead of __dict__
+    __slots__ = ("bb", "prev")
+
+    # Least recently used cache of path nodes, bounded by CACHE_SIZE.
+    # Nodes hold onto their emulated contexts, so leaving this unbounded would keep growing across functions.
+    _cache = collections.OrderedDict()
+    CACHE_SIZE = 10000
 
     def __init__(self, bb: "BasicBlock", prev: Optional["PathNode"]):
         """
@@ -38,12 +46,18 @@ class PathNode(object):
     @classmethod
     def from_cache(cls, bb: "BasicBlock", prev: Optional["PathNode"]):
         """Constructor that caches and reuses existing instances."""
+        key = (bb, prev)
+        cache = cls._cache
         try:
-            return cls._cache[(bb, prev)]
+            path_node = cache[key]
         except KeyError:
             path_node = cls(bb, prev)
-            cls._cache[(bb, prev)] = path_node
-            return path_node
+            cache[key] = path_node
+            if len(cache) > cls.CACHE_SIZE:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+        return path_node
 
     def __contains__(self, ea):
         return ea in self.bb
@@ -53,10 +67,13 @@ class PathNode(object):
 
     def path(self):
         """Returns a list of PathNode objects represented by the linked list."""
-        if self.prev:
-            return self.prev.path() + [self]
-        else:
-            return [self]
+        path = []
+        path_node = self
+        while path_node:
+            path.append(path_node)
+            path_node = path_node.prev
+        path.reverse()
+        return path
 
 
 @functools.total_ordering
@@ -86,6 +103,13 @@ class BasicBlock(object):
         self.start_ea = bb.start_ea
         self.end_ea = bb.end_ea
         self.type = self._fc._q.calc_block_type(self.id)
+        # Predecessors and successors are cached on first access.
+        self._preds = None
+        self._succs = None
+        self._sorted_preds = None
+        self._sorted_succs = None
+        # Instruction addresses are also cached on first access.
+        self._heads = None
 
     @classmethod
     def from_address(cls, ea):
@@ -101,20 +125,42 @@ class BasicBlock(object):
         """
         Iterates the predecessors list
         """
-        q = self._fc._q
-        for i in range(0, self._fc._q.npred(self.id)):
-            yield self._fc[q.pred(self.id, i)]
+        yield from self._get_preds()
 
     def succs(self):
         """
         Iterates the successors list
         """
-        q = self._fc._q
-        for i in range(0, q.nsucc(self.id)):
-            yield self._fc[q.succ(self.id, i)]
+        yield from self._get_succs()
 
     # endregion
 
+    def _get_preds(self) -> Tuple["BasicBlock", ...]:
+        """Obtains the cached predecessors."""
+        if self._preds is None:
+            q = self._fc._q
+            self._preds = tuple(self._fc[q.pred(self.id, i)] for i in range(0, q.npred(self.id)))
+        return self._preds
+
+    def _get_succs(self) -> Tuple["BasicBlock", ...]:
+        """Obtains the cached successors."""
+        if self._succs is None:
+            q = self._fc._q
+            self._succs = tuple(self._fc[q.succ(self.id, i)] for i in range(0, q.nsucc(self.id)))
+        return self._succs
+
+    def _get_sorted_preds(self) -> Tuple["BasicBlock", ...]:
+        """Obtains the cached predecessors sorted by start address."""
+        if self._sorted_preds is None:
+            self._sorted_preds = tuple(sorted(self._get_preds()))
+        return self._sorted_preds
+
+    def _get_sorted_succs(self) -> Tuple["BasicBlock", ...]:
+        """Obtains the cached successors sorted by start address."""
+        if self._sorted_succs is None:
+            self._sorted_succs = tuple(sorted(self._get_succs()))
+        return self._sorted_succs
+
     def __hash__(self):
         return self.start_ea
 
@@ -122,7 +168,8 @@ class BasicBlock(object):
         return "<BasicBlock(start_ea=0x{:08X}, end_ea=0x{:08X})>".format(self.start_ea, self.end_ea)
 
     def __eq__(self, other):
-        return self.start_ea == other.start_ea
+        # Blocks are cached by their Flowchart, so most comparisons are against the same instance.
+        return self is other or self.start_ea == other.start_ea
 
     def __lt__(self, other):
         return self.start_ea < other.start_ea
@@ -132,7 +179,39 @@ class BasicBlock(object):
 
     def __len__(self):
         """Length of block is the number of instructions contained within."""
-        return len(list(self.heads()))
+        return len(self._get_heads())
+
+    def _iter_heads(self) -> Iterator[int]:
+        """
+        Iterates the heads within the block directly from IDA.
+        This is a trimmed down version of idautils.Heads() which avoids its range defaults.
+        """
+        next_head = ida_bytes.next_head
+        end_ea = self.end_ea
+        ea = self.start_ea
+        if not ida_bytes.is_head(ida_bytes.get_flags(ea)):
+            ea = next_head(ea, end_ea)
+        while ea < end_ea and ea != ida_idaapi.BADADDR:
+            yield ea
+            ea = next_head(ea, end_ea)
+
+    def _get_heads(self, start=None, end=None) -> Tuple[int, ...]:
+        """
+        Obtains the cached heads within the given block.
+
+        :param start: Start address (defaults to start_ea)
+        :param end: End address, not including (defaults to end_ea)
+
+        :returns: Tuple of instruction addresses.
+        """
+        if self._heads is None:
+            self._heads = tuple(self._iter_heads())
+        heads = self._heads
+        if start is None and end is None:
+            return heads
+        start_index = 0 if start is None else bisect.bisect_left(heads, start)
+        end_index = len(heads) if end is None else bisect.bisect_left(heads, end)
+        return heads[start_index:end_index]
 
     def heads(self, start=None, reverse=False):
         """
@@ -149,54 +228,73 @@ class BasicBlock(object):
             raise ValueError("Start address 0x{:08X} is not in block: {!r}".format(start, self))
 
         if reverse:
-            yield from reversed(list(idautils.Heads(self.start_ea, start or self.end_ea)))
+            yield from reversed(self._get_heads(end=start or None))
         else:
-            yield from idautils.Heads(start or self.start_ea, self.end_ea)
+            yield from self._get_heads(start=start or None)
 
-    def paths(self, _visited=None) -> Iterator[_PATHNODE_CLASS]:
+    def paths(self) -> Iterator[_PATHNODE_CLASS]:
         """
         Iterates the paths that lead to this block.
 
-        :param _visited: Internally used.
         :yields: PathNode objects that represent the last entry of the path linked list.
         """
-        if _visited is None:
-            _visited = set()
+        path_node_class = self._PATHNODE_CLASS
 
-        # Otherwise generate path nodes and cache results for next time.
-        _visited.add(self.start_ea)
-
-        parents = list(self.preds())
+        # NOTE: Using the cached tuples of predecessors directly to avoid building new lists at each step.
+        parents = self._get_preds()
         if not parents:
-            yield self._PATHNODE_CLASS.from_cache(self, prev=None)
-        else:
-            for parent in parents:
-                if parent.start_ea in _visited:
-                    continue
+            yield path_node_class.from_cache(self, prev=None)
+            return
 
-                # Create path nodes for each path of parent.
-                for parent_path in parent.paths(_visited=_visited):
-                    yield self._PATHNODE_CLASS.from_cache(self, prev=parent_path)
+        # Blocks that can't be reached from a starting block (e.g. isolated loops of dead code)
+        # will never lead to a full path, so don't bother exploring them.
+        rooted = self._fc._get_rooted_blocks()
+        if self.start_ea not in rooted:
+            return
+
+        # Walk up the predecessors using an explicit stack of the blocks in the current path
+        # (starting with this block) along with an iterator of their parents left to explore.
+        stack = [(self, iter(parents))]
+        visited = {self.start_ea}
+        while stack:
+            _, parents = stack[-1]
+            for parent in parents:
+                if parent.start_ea not in visited and parent.start_ea in rooted:
+                    break
+            else:
+                block, _ = stack.pop()
+                visited.remove(block.start_ea)
+                continue
 
-        _visited.remove(self.start_ea)
+            grandparents = parent._get_preds()
+            if grandparents:
+                stack.append((parent, iter(grandparents)))
+                visited.add(parent.start_ea)
+            else:
+                # Reached the start of a path, generate its path nodes back down to this block.
+                path_node = path_node_class.from_cache(parent, prev=None)
+                for block, _ in reversed(stack):
+                    path_node = path_node_class.from_cache(block, prev=path_node)
+                yield path_node
 
-    def ancestors(self, _visited=None) -> Set["BasicBlock"]:
+    def ancestors(self) -> Set["BasicBlock"]:
         """
         Returns a set of ancestor blocks for the given block.
 
-        :param _visited: Internally used.
-
         :returns: Set of ancestor blocks.
         """
-        if _visited is None:
-            _visited = set()
-
-        _visited.add(self)
-
-        parents = set(parent for parent in self.preds() if parent not in _visited)
-        ancestors = parents.union(*(parent.ancestors(_visited=_visited) for parent in parents))
-
-        _visited.remove(self)
+        # Every block reachable through the predecessors (besides this block) is an ancestor,
+        # so we only need to visit each block once.
+        ancestors = set()
+        visited = {self.start_ea}
+        non_visited = [self]
+        while non_visited:
+            block = non_visited.pop()
+            for parent in block._get_preds():
+                if parent.start_ea not in visited:
+                    visited.add(parent.start_ea)
+                    ancestors.add(parent)
+                    non_visited.append(parent)
 
         return ancestors
 
@@ -225,6 +323,15 @@ class Flowchart(object):
         self._q = ida_gdl.qflow_chart_t(
             "", self.func_obj, ida_idaapi.BADADDR, ida_idaapi.BADADDR, ida_gdl.FC_PREDS
         )
+        # Number of blocks in the graph. (Cached to avoid calling into IDA on each iteration or lookup.)
+        self._size = self._q.size()
+        # Cache of created BasicBlock objects keyed by index.
+        self._blocks = {}
+        # Non-empty blocks sorted by start address (along with their start addresses) used for find_block()
+        self._sorted_blocks = None
+        self._block_starts = None
+        # Start addresses of blocks reachable from a block without predecessors, used for paths()
+        self._rooted_blocks = None
 
     @classmethod
     def from_cache(cls, func_ea):
@@ -244,13 +351,23 @@ class Flowchart(object):
 
     @property
     def size(self):
-        return self._q.size()
+        return self._size
 
     def refresh(self):
         self._q.refresh()
+        self._size = self._q.size()
+        self._blocks = {}
+        self._sorted_blocks = None
+        self._block_starts = None
+        self._rooted_blocks = None
 
     def _getitem(self, index):
-        return self._BASICBLOCK_CLASS(index, self._q[index], self)
+        try:
+            return self._blocks[index]
+        except KeyError:
+            block = self._BASICBLOCK_CLASS(index, self._q[index], self)
+            self._blocks[index] = block
+            return block
 
     def __iter__(self):
         return (self._getitem(index) for index in range(0, self.size))
@@ -277,18 +394,19 @@ class Flowchart(object):
         """
         # Set our flag to True if start_ea is none so we yield all blocks, else wait till we find the requested block
         block_found = start_ea is None
-        non_visited = [self[0]]
+        non_visited = collections.deque([self[0]])
         visited = set()
         while non_visited:
-            cur_block = non_visited.pop(0)
+            cur_block = non_visited.popleft()
             if hash(cur_block) in visited:
                 continue
 
             visited.add(hash(cur_block))
-            succs = sorted(cur_block.succs())
+            # Don't bother queuing blocks we have already visited.
+            succs = [succ for succ in cur_block._get_sorted_succs() if hash(succ) not in visited]
             if dfs:
-                # [0:0] allows us to extend to the front
-                non_visited[0:0] = succs
+                # extendleft() adds in reverse order, so reverse to keep sorted order at the front.
+                non_visited.extendleft(reversed(succs))
             else:
                 non_visited.extend(succs)
 
@@ -309,24 +427,24 @@ class Flowchart(object):
         :yield: function block object
         """
         if start_ea:
-            non_visited = [self.find_block(start_ea)]
+            non_visited = collections.deque([self.find_block(start_ea)])
         else:
-            non_visited = list(sorted(self, key=attrgetter("start_ea")))[-1:]
+            non_visited = collections.deque([max(self, key=attrgetter("start_ea"))])
 
         visited = set()
         while non_visited:
-            cur_block = non_visited.pop(0)
+            cur_block = non_visited.popleft()
             if hash(cur_block) in visited:
                 continue
 
             visited.add(hash(cur_block))
 
-            preds = sorted(cur_block.preds(), reverse=True)
+            preds = cur_block._get_sorted_preds()[::-1]
             # For now, only consider predicates that are before the current block.
             # This helps to prevent cyclic loops.
-            preds = [pred for pred in preds if pred < cur_block]
+            preds = [pred for pred in preds if pred < cur_block and hash(pred) not in visited]
             if dfs:
-                non_visited[0:0] = preds
+                non_visited.extendleft(reversed(preds))
             else:
                 non_visited.extend(preds)
 
@@ -366,6 +484,23 @@ class Flowchart(object):
 
             _first_block = False
 
+    def _get_rooted_blocks(self) -> Set[int]:
+        """
+        Obtains the start addresses of blocks which are reachable from a block without predecessors.
+        (ie. blocks which have at least one path leading to them.)
+        """
+        if self._rooted_blocks is None:
+            non_visited = [block for block in self if not block._get_preds()]
+            rooted = {block.start_ea for block in non_visited}
+            while non_visited:
+                block = non_visited.pop()
+                for succ in block._get_succs():
+                    if succ.start_ea not in rooted:
+                        rooted.add(succ.start_ea)
+                        non_visited.append(succ)
+            self._rooted_blocks = rooted
+        return self._rooted_blocks
+
     def find_block(self, ea):
         """
         Locate a BasicBlock which contains the specified ea
@@ -375,7 +510,16 @@ class Flowchart(object):
         :return: CustomBasicBlock object or None if not found.
         :rtype: BasicBlock
         """
-        for block in self:
+        if self._sorted_blocks is None:
+            self._sorted_blocks = sorted(
+                (block for block in self if block.start_ea < block.end_ea), key=attrgetter("start_ea")
+            )
+            self._block_starts = [block.start_ea for block in self._sorted_blocks]
+
+        # Blocks don't overlap, so the only candidate is the last block starting at or before the ea.
+        index = bisect.bisect_right(self._block_starts, ea) - 1
+        if index >= 0:
+            block = self._sorted_blocks[index]
             if ea in block:
                 return block
 
@@ -11,7 +11,7 @@ from copy import deepcopy
 import collections
 import logging
 import warnings
-from typing import List, Tuple, Optional, Union
+from typing import Iterable, List, Tuple, Optional, Union
 
 import ida_frame
 import ida_funcs
@@ -276,6 +276,25 @@ class ProcessorContext(object):
         else:
             self.instruction.execute()
 
+    def execute_heads(self, heads: Iterable[int], call_depth: int = 0):
+        """
+        "Execute" each instruction in the given sequence of addresses in order.
+        Unlike execute(), this does not follow the control flow of the executed instructions,
+        which makes it useful for replaying the instructions of a single basic block.
+
+        :param heads: Addresses of instructions to execute.
+        :param call_depth: Number of function calls we are allowed to emulate into.
+            (Defaults to not emulating into any function calls.)
+        """
+        if call_depth < 0:
+            raise ValueError("call_depth must be a non-negative integer")
+        self._call_depth = call_depth
+
+        # Avoid the overhead of execute() and the instruction property for each address.
+        instruction_class = self._instruction_class
+        for ip in heads:
+            instruction_class(self, ip).execute()
+
     def _execute_call(self, func_name: str, func_address: int, call_address: int = None):
         """
         Executes the call to the given function.
@@ -440,8 +440,12 @@ class Emulator(object):
         else:
             for context in init_contexts():
                 flowchart = Flowchart.from_cache(address)
+                # Use the same init_context for all paths so path nodes shared between paths
+                # can reuse their previously emulated contexts instead of emulating from scratch.
+                # (PathNode makes its own copy before emulating, so this will not get modified.)
+                context = deepcopy(context)
                 for path_node in flowchart.get_paths(address):
-                    yield path_node.cpu_context(address, call_depth=call_depth, init_context=deepcopy(context))
+                    yield path_node.cpu_context(address, call_depth=call_depth, init_context=context)
 
                     # Don't process other paths if we are at the user call level and exhaustive wasn't choosen.
                     if not _first_call and not exhaustive:
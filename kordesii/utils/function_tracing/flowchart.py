@@ -3,13 +3,12 @@ This module extends the flowchart module in kordesii.utils in order to add Proce
 tracking and emulation.
 """
 from __future__ import annotations
+import collections
 import logging
 import warnings
 from copy import deepcopy
 from typing import TYPE_CHECKING, Optional
 
-import idautils
-
 from kordesii.utils import flowchart
 
 if TYPE_CHECKING:
@@ -25,7 +24,9 @@ class PathNode(flowchart.PathNode):
     Extends original PathNode to add ability to get cpu_context.
     """
 
-    _cache = {}
+    __slots__ = ("_context", "_context_ea", "_init_context", "_call_depth")
+
+    _cache = collections.OrderedDict()
 
     def __init__(self, bb: BasicBlock, prev: Optional[PathNode]):
         """
@@ -93,8 +94,7 @@ class PathNode(flowchart.PathNode):
             if self._context_ea != end:
                 # Fill context up to requested ea.
                 logger.debug("Emulating instructions 0x%08X -> 0x%08X", self._context_ea, end)
-                for ip in idautils.Heads(self._context_ea, end):
-                    self._context.execute(ip, call_depth=call_depth)
+                self._context.execute_heads(self.bb._get_heads(self._context_ea, end), call_depth=call_depth)
 
             self._context_ea = end
 
@@ -18,16 +18,24 @@ warnings.warn(
 logger = logging.getLogger(__name__)
 
 
-# Create a global Emulator to keep backwards compatibility with the legacy FunctionTracer and TracerCache.
-try:
-    _emulator = Emulator()
-except NotImplementedError:
-    _emulator = None
+# Global Emulator to keep backwards compatibility with the legacy FunctionTracer and TracerCache.
+# This is created on first use so importing function_tracing doesn't pay for it.
+_emulator = None
+
+
+def _get_emulator():
+    global _emulator
+    if _emulator is None:
+        try:
+            _emulator = Emulator()
+        except NotImplementedError:
+            pass
+    return _emulator
 
 
 def FunctionTracer(func_ea):
     warnings.warn("FunctionTracer class is deprecated. Please create an instance of Emulator instead.", DeprecationWarning)
-    return _emulator
+    return _get_emulator()
 
 
 class TracerCache(object):
@@ -35,27 +43,27 @@ class TracerCache(object):
         warnings.warn("TracerCache is deprecated, please use an instance of Emulator instead.", DeprecationWarning)
 
     def get(self, ea, default="NOTSET"):
-        return _emulator
+        return _get_emulator()
 
     def hook(self, name_or_start_ea, func):
-        _emulator.hook_call(name_or_start_ea, func)
+        _get_emulator().hook_call(name_or_start_ea, func)
 
     def clear_hooks(self):
-        _emulator.reset_hooks()
+        _get_emulator().reset_hooks()
 
 
 def get_tracer(ea, default="NOTSET"):
     warnings.warn("get_tracer() is deprecated. Please create an instance of Emulator instead.", DeprecationWarning)
-    return _emulator
+    return _get_emulator()
 
 
 def hook_tracers(name_or_start_ea, func):
     warnings.warn(
         "hook_tracers() is deprecated. Please call hook_call() on an instance of Emulator instead.", DeprecationWarning)
-    _emulator.hook_call(name_or_start_ea, func)
+    _get_emulator().hook_call(name_or_start_ea, func)
 
 
 def clear_hooks():
     warnings.warn(
         "clear_hooks() is deprecated. Please call clear_hooks() on an instance of Emulator instead.", DeprecationWarning)
-    _emulator.reset_hooks()
+    _get_emulator().reset_hooks()
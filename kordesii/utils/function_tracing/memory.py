@@ -101,6 +101,8 @@ class PageMap(collections.defaultdict):
     New pages uses the bytes from the IDB if in a segment.
     Segments pages will be mapped, but data retrieval will be delayed until the page
     is requested. (Helps to avoid unnecessary processing of large unused data segments.)
+    Pages are shared with copies of the map and only get copied once they are requested for writing.
+    (Helps to avoid copying every page each time a cpu context is copied.)
     """
 
     PAGE_SIZE = 0x1000
@@ -112,13 +114,17 @@ class PageMap(collections.defaultdict):
     def __init__(self, map_segments=True):
         # Setting default_factory to None, because we have overwritten it in __missing__()
         super(PageMap, self).__init__(None)
+        # Indexes of pages not shared with a copy of this map, which can be modified in place.
+        self._owned = set()
         if map_segments:
             self.map_segments()
 
     def __deepcopy__(self, memo):
         copy = PageMap(map_segments=False)
         memo[id(self)] = copy
-        copy.update({index: (page[:] if page is not None else None) for index, page in self.items()})
+        # Share the pages with the copy. Whichever map writes to a page first will copy it.
+        copy.update(dict.items(self))
+        self._owned.clear()
         return copy
 
     def __missing__(self, page_index):
@@ -129,6 +135,7 @@ class PageMap(collections.defaultdict):
         :rtype: bytearray
         """
         ret = self[page_index] = self._new_page(page_index)
+        self._owned.add(page_index)
         return ret
 
     def __getitem__(self, page_index):
@@ -142,6 +149,11 @@ class PageMap(collections.defaultdict):
         if page is None:
             return self.__missing__(page_index)
 
+        # If page is shared with another map, copy it before the caller can modify it.
+        if page_index not in self._owned:
+            page = self[page_index] = page[:]
+            self._owned.add(page_index)
+
         return page
 
     def _is_delayed(self, page_index):
@@ -208,7 +220,8 @@ class PageMap(collections.defaultdict):
         :rtype: bytearray
         """
         if page_index in self and not self._is_delayed(page_index):
-            return self[page_index]
+            # Pull directly to avoid copying a shared page.
+            return super(PageMap, self).__getitem__(page_index)
         return self._new_page(page_index)
 
 
@@ -61,7 +61,8 @@ class Register(object):
         copy_dict["size"] = self.size
         copy_dict["_size_mask"] = self._size_mask
         copy_dict["_value"] = self._value
-        copy_dict["_masks"] = dict(self._masks)
+        # Masks never change after initialization, so they can be safely shared between copies.
+        copy_dict["_masks"] = self._masks
         return copy
 
     def __getattr__(self, reg_name):
@@ -129,7 +130,8 @@ class RegisterMap(object):
 
         copy_dict = copy.__dict__
         copy_dict["_registers"] = [deepcopy(reg, memo) for reg in self._registers]
-        copy_dict["_reg_map"] = self._build_reg_map(copy._registers)
+        # Remap to the copied registers instead of rebuilding (and revalidating) the map from scratch.
+        copy_dict["_reg_map"] = {name: memo[id(reg)] for name, reg in self._reg_map.items()}
 
         return copy
 
@@ -923,3 +923,25 @@ Cars and busses stalled in sand drifts.
 The jacket hung on the back of the wide chair.
 32908741328907498134712304814879837483274809123748913251236598123056231895712
 """
+
+
+@pytest.mark.in_ida
+def test_execute_heads_x86():
+    """
+    Tests executing a sequence of instructions with ProcessorContext.execute_heads()
+    """
+    import idautils
+    from kordesii.utils import function_tracing
+    emulator = function_tracing.Emulator()
+    heads = list(idautils.Heads(0x401150, 0x40115D))
+
+    ctx = emulator.new_context()
+    for ip in heads:
+        ctx.execute(ip)
+    expected = ctx
+
+    ctx = emulator.new_context()
+    ctx.execute_heads(heads)
+    assert ctx.executed_instructions == expected.executed_instructions == heads
+    assert ctx.ip == expected.ip == 0x40115D
+    assert ctx.registers.esp == expected.registers.esp
@@ -77,6 +77,31 @@ def test_memory():
     assert m.read(second_alloc_realloced_ea, 10) == b"helloworld"  # data should be copied over.
 
 
+@pytest.mark.in_ida
+def test_memory_copy():
+    """Tests copies of memory share pages until they are written to."""
+    from copy import deepcopy
+    from kordesii.utils.function_tracing.memory import Memory
+
+    m = Memory()
+    m.write(0x00121000, b"helloworld")
+    m_copy = deepcopy(m)
+    assert m_copy._pages.peek(0x121) is m._pages.peek(0x121)
+
+    m_copy.write(0x00121000, b"HELLO")
+    assert m.read(0x00121000, 10) == b"helloworld"
+    assert m_copy.read(0x00121000, 10) == b"HELLOworld"
+
+    m.write(0x00121005, b"WORLD")
+    assert m.read(0x00121000, 10) == b"helloWORLD"
+    assert m_copy.read(0x00121000, 10) == b"HELLOworld"
+
+    # Segment data should also be independent.
+    m_copy.write(0x0040C000, b"hello")
+    assert m.read(0x0040C000, 11) == b"Idmmn!Vnsme"
+    assert m_copy.read(0x0040C000, 11) == b"hello!Vnsme"
+
+
 @pytest.mark.in_ida
 def test_streaming():
     """
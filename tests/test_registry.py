@@ -76,3 +76,22 @@ def test_iter_decoders(monkeypatch, Sample_decoder):
 
     assert list(kordesii.iter_decoders(name="bogus")) == []
     assert list(kordesii.iter_decoders(source="bogus")) == []
+
+
+
+def test_find_script_path(monkeypatch, tmpdir):
+    monkeypatch.setattr("kordesii.registry._sources", {})
+    kordesii.register_decoder_directory(str(tmpdir))
+
+    legacy_path = tmpdir / "foo_StringDecode.py"
+    legacy_path.write("")
+    assert [decoder.script_path for decoder in kordesii.iter_decoders("foo")] == [str(legacy_path)]
+
+    # Non-legacy script takes precedence.
+    script_path = tmpdir / "foo.py"
+    script_path.write("")
+    assert [decoder.script_path for decoder in kordesii.iter_decoders("foo")] == [str(script_path)]
+
+    script_path.remove()
+    legacy_path.remove()
+    assert list(kordesii.iter_decoders("foo")) == []
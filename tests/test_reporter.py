@@ -0,0 +1,227 @@
+"""
+Tests Reporter functionality that doesn't require running IDA.
+"""
+
+import base64
+import collections
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+
+import pytest
+
+import kordesii
+from kordesii import reporter as reporter_module
+
+
+def test_add_output_file():
+    reporter = kordesii.Reporter(base64outputfiles=True)
+    # Use data larger than a single chunk to test streaming.
+    data = bytes(range(256)) * 1000
+    assert len(data) > reporter_module._CHUNK_SIZE
+
+    reporter.add_output_file("file1.bin", data, description="from bytes")
+    reporter.add_output_file("file2.bin", io.BytesIO(data))
+
+    md5 = hashlib.md5(data).hexdigest()
+    encoded = base64.b64encode(data).decode("latin1")
+    assert reporter.metadata["files"] == [
+        ["file1.bin", "from bytes", md5, encoded],
+        ["file2.bin", "", md5, encoded],
+    ]
+    assert reporter.get_file_contents("file1.bin") == data
+    assert reporter.get_file_contents("file2.bin") == data
+    assert reporter.get_file_contents("missing.bin") is None
+
+
+def test_add_output_file_no_base64():
+    reporter = kordesii.Reporter()
+    data = b"hello world"
+
+    reporter.add_output_file("file.bin", io.BytesIO(data))
+    assert reporter.metadata["files"] == [["file.bin", "", hashlib.md5(data).hexdigest()]]
+    assert reporter.get_file_contents("file.bin") is None
+
+    reporter.add_output_file("other_data.yml", io.BytesIO(b"key: value\n"))
+    assert reporter.metadata["other_data"] == "key: value\n"
+
+
+def test_get_output_text():
+    reporter = kordesii.Reporter()
+    assert reporter.get_output_text() == "----Decoded Strings----\n\nNo decoded strings found\n"
+
+    reporter.add_string("hello")
+    reporter.add_string("new\nline")
+    reporter.add_output_file("file.bin", b"data")
+    reporter.metadata["debug"] = ["[+] debug message"]
+    reporter.ida_log = "ida log"
+    reporter.errors = ["[!] error message"]
+    assert reporter.get_output_text() == (
+        "----Decoded Strings----\n\n"
+        "hello\n"
+        "new\\nline\n"
+        "\n----Files----\n\n"
+        "file.bin\n"
+        "\n----Debug----\n\n"
+        "[+] debug message\n"
+        "\n----IDA Log----\n\n"
+        "ida log\n"
+        "\n----Errors----\n\n"
+        "[!] error message\n"
+    )
+
+
+def test_use_tmpfs(tmpdir):
+    # Explicitly provided tempdir always takes precedence.
+    reporter = kordesii.Reporter(tempdir=str(tmpdir), use_tmpfs=True)
+    assert reporter.tempdir == str(tmpdir)
+
+    reporter = kordesii.Reporter(use_tmpfs=True)
+    if os.path.isdir(reporter_module.TMPFS_DIR) and os.access(reporter_module.TMPFS_DIR, os.W_OK):
+        assert reporter.tempdir == reporter_module.TMPFS_DIR
+    else:
+        assert reporter.tempdir == tempfile.gettempdir()
+
+
+def test_get_serialized():
+    # other_data should be available even if we are not storing base64 encoded file contents.
+    reporter = kordesii.Reporter()
+    reporter.add_output_file("other_data.yml", b"key: value\n")
+    assert reporter.other_data == {"key": "value"}
+
+    reporter = kordesii.Reporter(base64outputfiles=True)
+    reporter.add_output_file("other_data.yml", b"key: value\n")
+    reporter.add_output_file("custom.yml", b"- 1\n- 2\n")
+    assert reporter.other_data == {"key": "value"}
+    assert reporter.get_serialized("custom") == [1, 2]
+
+    # Non-ASCII text should be deserialized from the original UTF-8 bytes.
+    for base64outputfiles in (False, True):
+        reporter = kordesii.Reporter(base64outputfiles=base64outputfiles)
+        reporter.add_output_file("other_data.yml", "name: café 日本\n".encode("utf8"))
+        assert reporter.other_data == {"name": "café 日本"}
+
+
+@pytest.fixture
+def mock_decoder(tmpdir, monkeypatch):
+    """
+    Installs a mock "mock" decoder which records the input file and data of each run.
+    Also resets the reporter's result cache and tempdir pool so tests don't affect each other.
+    """
+    monkeypatch.setattr(kordesii.Reporter, "_result_cache", collections.OrderedDict())
+    monkeypatch.setattr(reporter_module, "_tempdir_pool", collections.defaultdict(collections.deque))
+
+    script_path = tmpdir.mkdir("decoders") / "mock.py"
+    script_path.write("")
+
+    class MockDecoder:
+        full_name = "mock"
+
+        def __init__(self):
+            self.script_path = str(script_path)
+            self.runs = []
+
+        def run(self, input_file, reporter, **run_config):
+            with open(input_file, "rb") as fo:
+                self.runs.append((input_file, fo.read()))
+            reporter.add_string("decoded")
+
+    decoder = MockDecoder()
+    monkeypatch.setattr(kordesii, "iter_decoders", lambda name: [decoder])
+    return decoder
+
+
+def test_run_decoder_data(tmpdir, mock_decoder):
+    """Tests the temporary input file created when running a decoder on a data buffer."""
+    data = os.urandom(reporter_module._CHUNK_SIZE * 2 + 10)
+    reporter = kordesii.Reporter(tempdir=str(tmpdir))
+    reporter.run_decoder("mock", data=data)
+
+    assert len(mock_decoder.runs) == 1
+    input_file, input_data = mock_decoder.runs[0]
+    assert os.path.basename(input_file) == hashlib.md5(data).hexdigest()
+    assert input_data == data
+    # Managed tempdir should be cleaned up.
+    assert not os.path.exists(input_file)
+
+
+def test_run_decoder_cache(tmpdir, mock_decoder):
+    """Tests results are reused when the same decoder is run on the same data."""
+    runs = mock_decoder.runs
+
+    reporter = kordesii.Reporter(tempdir=str(tmpdir), cache_results=True)
+    reporter.run_decoder("mock", data=b"data")
+    assert len(runs) == 1
+    assert reporter.get_strings() == ["decoded"]
+
+    # Same data should pull from cache, even from a different reporter.
+    reporter = kordesii.Reporter(tempdir=str(tmpdir), cache_results=True)
+    reporter.run_decoder("mock", data=b"data")
+    assert len(runs) == 1
+    assert reporter.get_strings() == ["decoded"]
+    # Ensure modifying results doesn't affect the cache.
+    reporter.add_string("other")
+    reporter.run_decoder("mock", data=b"data")
+    assert reporter.get_strings() == ["decoded"]
+
+    # Different data or run configuration should not.
+    reporter.run_decoder("mock", data=b"other data")
+    assert len(runs) == 2
+    reporter.run_decoder("mock", data=b"data", log=True)
+    assert len(runs) == 3
+
+    # Modifying the decoder should invalidate the cache.
+    os.utime(mock_decoder.script_path, (0, 0))
+    reporter.run_decoder("mock", data=b"data")
+    assert len(runs) == 4
+
+    # Cache is not used unless enabled.
+    reporter = kordesii.Reporter(tempdir=str(tmpdir))
+    reporter.run_decoder("mock", data=b"data")
+    assert len(runs) == 5
+
+
+def test_run_decoder_mmap(tmpdir, mock_decoder):
+    """Tests running a decoder on memory mapped data."""
+    data = os.urandom(reporter_module._CHUNK_SIZE * 2 + 10)
+    sample = tmpdir / "sample.bin"
+    sample.write_binary(data)
+
+    reporter = kordesii.Reporter(tempdir=str(tmpdir), cache_results=True)
+    with open(str(sample), "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        reporter.run_decoder("mock", data=mapped)
+    assert [input_data for _, input_data in mock_decoder.runs] == [data]
+    # md5 computed for the cache key should also be used to name the input file.
+    input_file, _ = mock_decoder.runs[0]
+    assert os.path.basename(input_file) == hashlib.md5(data).hexdigest()
+
+
+def test_pool_tempdirs(tmpdir, mock_decoder):
+    reporter = kordesii.Reporter(tempdir=str(tmpdir), pool_tempdirs=True)
+    reporter.run_decoder("mock", data=b"data")
+    reporter.run_decoder("mock", data=b"other data")
+
+    # Same managed tempdir should be reused, but emptied between runs.
+    input_files = [input_file for input_file, _ in mock_decoder.runs]
+    assert len(input_files) == 2
+    managed_tempdir = os.path.dirname(input_files[0])
+    assert os.path.dirname(input_files[1]) == managed_tempdir
+    assert os.path.isdir(managed_tempdir)
+    assert os.listdir(managed_tempdir) == []
+    assert list(reporter_module._tempdir_pool[str(tmpdir)]) == [managed_tempdir]
+
+    reporter_module._purge_tempdir_pool()
+    assert not os.path.exists(managed_tempdir)
+
+
+def test_add_strings():
+    reporter = kordesii.Reporter()
+    reporter.add_strings([])
+    assert "strings" not in reporter.metadata
+
+    reporter.add_string("first")
+    reporter.add_strings(["second", b"third"])
+    reporter.add_strings([])
+    assert reporter.get_strings() == ["first", "second", "third"]
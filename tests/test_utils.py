@@ -107,3 +107,16 @@ def test_iter_callers():
     assert len(callers) == 1
     caller = callers[0]
     assert caller.start_ea == 0x401030
+
+
+@pytest.mark.in_ida
+def test_crypto():
+    from kordesii.utils import crypto
+
+    assert crypto.xor_decrypt(b"hello", 0x01) == b"idmmn"
+    assert crypto.xor_decrypt(b"hello", b"\x01\x02") == b"igmnn"
+    assert crypto.xor_decrypt(b"", 0x01) == b""
+    with pytest.raises(ValueError):
+        crypto.xor_decrypt(b"hello", b"")
+
+    assert crypto.rc4_decrypt(bytes.fromhex("BBF316E8D940AF0AD3"), b"Key") == b"Plaintext"